@@ -2,7 +2,8 @@ from __future__ import annotations
 
 import sys
 from enum import Enum
-from typing import Any, TextIO
+from functools import cache
+from typing import Any, TextIO, Tuple
 
 
 class Color(Enum):
@@ -24,16 +25,9 @@ def pretty(message: Any, color: Color = None, bold: bool = False,
     msg = message
 
     if out_file.isatty():
-        attrs = []
-
-        if color:
-            attrs.append(str(color.value))
-
-        if bold:
-            attrs.append('1')
-
-        if len(attrs) > 0:
-            msg = u'\x1b' f'[{";".join(attrs)}m{msg}' u'\x1b[0m'
+        prefix, suffix = ansi_envelope(color, bold)
+        if prefix:
+            msg = f'{prefix}{msg}{suffix}'
 
     if endl:
         print(msg, file=out_file)
@@ -42,6 +36,23 @@ def pretty(message: Any, color: Color = None, bold: bool = False,
         out_file.flush()
 
 
+@cache
+def ansi_envelope(color: Color | None = None, bold: bool = False) -> Tuple[str, str]:
+    """Returns the ANSI escape sequences that enclose a message printed with the given style."""
+    attrs = []
+
+    if color:
+        attrs.append(str(color.value))
+
+    if bold:
+        attrs.append('1')
+
+    if not attrs:
+        return '', ''
+
+    return u'\x1b' f'[{";".join(attrs)}m', u'\x1b[0m'
+
+
 def _make_color_print(color: Color | None, file: TextIO = None):
     def _color_print(message: Any, bold: bool = False, endl: bool = True,
                      out_file: TextIO = sys.stdout) -> None:
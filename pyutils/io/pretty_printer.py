@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 import math
-from typing import Any, Iterable, Iterator, List, TextIO
+from typing import Any, Dict, Iterable, Iterator, List, TextIO
 
 from . import echo, file
-from ..types import string
+
+_NON_PRINT_FUNCTIONS = frozenset(('ansi_envelope',))
 
 
 class PrettyPrinter:
@@ -44,6 +45,7 @@ class PrettyPrinter:
                 self.__streams.append(arg)
 
         self.__files: List[TextIO] | None = None
+        self.__isatty: Dict[TextIO, bool] = {}
         self.__last_char_is_newline = True
         self.__newlines = 0
         self.__prev_newlines = 1
@@ -61,14 +63,20 @@ class PrettyPrinter:
             self.close()
 
     def __getattr__(self, item: str):
-        def _gen_func(f):
-            def _wrapper(*args, **kwargs):
-                self._print(f, *args, **kwargs)
-            return _wrapper
+        # Only print functions are forwarded: private names and echo's helpers are not.
+        if item.startswith('_') or item in _NON_PRINT_FUNCTIONS:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{item}'")
 
         func = getattr(echo, item)
-        if callable(func):
-            return _gen_func(func)
+        if not callable(func):
+            return None
+
+        def _wrapper(*args, **kwargs):
+            self._print(func, *args, **kwargs)
+
+        # Cache the wrapper in the instance dict, so that __getattr__ is bypassed next time.
+        setattr(self, item, _wrapper)
+        return _wrapper
 
     def __call__(self, *args, **kwargs):
         self.print(*args, **kwargs)
@@ -76,7 +84,12 @@ class PrettyPrinter:
     def print(self, message: Any, color: echo.Color = None,
               bold: bool = False, underline: str | None = None, endl: bool = True) -> None:
         """Prints the specified message."""
-        self._print(echo.pretty, message, color=color, bold=bold, underline=underline, endl=endl)
+        self._write([self._format(message, underline, endl)], color=color, bold=bold)
+
+    def print_lines(self, messages: Iterable[Any], color: echo.Color = None,
+                    bold: bool = False, underline: str | None = None) -> None:
+        """Prints the specified messages, each on its own line, with a single write per stream."""
+        self._write([self._format(m, underline, True) for m in messages], color=color, bold=bold)
 
     def spacer(self, count: int = 1, flush: bool = False) -> None:
         """Prints a spacer that is aware of any previously printed newlines."""
@@ -91,6 +104,22 @@ class PrettyPrinter:
             for s in self._streams():
                 func(message, out_file=s, endl=False, **kwargs)
 
+    def _write(self, chunks: List[str], color: echo.Color | None = None,
+               bold: bool = False) -> None:
+        prefix, suffix = echo.ansi_envelope(color, bold)
+        styled = [f'{prefix}{c}{suffix}' for c in chunks] if prefix else chunks
+
+        with self:
+            for s in self._streams():
+                s.writelines(styled if self._isatty(s) else chunks)
+                s.flush()
+
+    def _isatty(self, stream: TextIO) -> bool:
+        isatty = self.__isatty.get(stream)
+        if isatty is None:
+            isatty = self.__isatty[stream] = stream.isatty()
+        return isatty
+
     def _streams(self) -> Iterable[TextIO]:
         yield from self.__streams
         if self.__files:
@@ -114,7 +143,7 @@ class PrettyPrinter:
 
         # Remaining part of the message
         max_len = 0
-        for line in string.split(msg[count:], sep='\n', strip=False):
+        for line in msg[count:].split('\n'):
             if line:
                 yield indent + line if indent and self.__prev_newlines else line
                 self.__prev_newlines = 1
@@ -145,6 +174,7 @@ class PrettyPrinter:
             return
         for f in self.__files:
             f.close()
+            self.__isatty.pop(f, None)
         self.__files = None
 
     def clear(self) -> None:
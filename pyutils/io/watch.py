@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import ctypes
+import os
+import select
+from enum import IntFlag
+from functools import cache
+from time import sleep
+
+
+class Mask(IntFlag):
+    """Filesystem events that can be watched."""
+    MODIFY = 0x002
+    CLOSE_WRITE = 0x008
+    MOVED_TO = 0x080
+    CREATE = 0x100
+
+
+class Watch:
+    """
+    Waits for filesystem events on a path. Relies on inotify where available,
+    otherwise it degrades to sleeping for short intervals.
+    """
+
+    def __init__(self, path: str, mask: Mask = Mask.CREATE | Mask.MOVED_TO | Mask.CLOSE_WRITE,
+                 poll_interval: float = 0.05) -> None:
+        self.poll_interval = poll_interval
+        self._fd = _inotify_watch(path, mask)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """
+        Blocks until an event occurs or the timeout expires.
+        If inotify is not available, sleeps for at most 'poll_interval' seconds.
+
+        :param timeout: Timeout in seconds.
+        :return: False if the timeout expired, True otherwise.
+            Callers should re-check the condition they are waiting for in both cases.
+        """
+        if self._fd is None:
+            sleep(self.poll_interval if timeout is None else min(timeout, self.poll_interval))
+            return True
+
+        if not select.select([self._fd], [], [], timeout)[0]:
+            return False
+
+        try:
+            while os.read(self._fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+        return True
+
+    def close(self) -> None:
+        """Stops watching the path."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+# Private functions
+
+
+@cache
+def _libc():
+    """Returns the C library, or None if it cannot be loaded."""
+    try:
+        return ctypes.CDLL(None, use_errno=True)
+    except (OSError, TypeError):
+        return None
+
+
+def _inotify_watch(path: str, mask: Mask) -> int | None:
+    """Returns a non-blocking inotify descriptor watching the path, or None if unsupported."""
+    try:
+        libc = _libc()
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    except AttributeError:
+        return None
+
+    if fd < 0:
+        return None
+
+    if libc.inotify_add_watch(fd, os.fsencode(path), int(mask)) < 0:
+        os.close(fd)
+        return None
+
+    return fd
@@ -3,16 +3,19 @@ from __future__ import annotations
 import platform
 import signal
 import subprocess as sp
-from threading import Event, Thread
+from threading import Timer
 from time import perf_counter_ns
 
-from .task import Task
+from .task import OutputAction, Task
+from .util import has_pidfd
 from .. import exc
 
 
 class Benchmark:
     """Run benchmarks for a given task."""
 
+    __slots__ = ('_task', '_max_memory', '_nanos', '_timed_out')
+
     @property
     def task(self) -> Task:
         return self._task
@@ -33,34 +36,81 @@ class Benchmark:
     def seconds(self) -> float:
         return self._nanos / 1E9
 
+    @property
+    def name(self) -> str:
+        return self._task.name
+
+    @property
+    def pid(self) -> int | None:
+        return self._task.pid
+
+    @property
+    def stdout(self) -> str | None:
+        return self._task.stdout
+
+    @property
+    def stderr(self) -> str | None:
+        return self._task.stderr
+
+    @property
+    def completed(self) -> bool:
+        return self._task.completed
+
+    @property
+    def exit_code(self) -> int | None:
+        return self._task.exit_code
+
+    @property
+    def rusage(self):
+        return self._task.rusage
+
     def __init__(self, task: Task) -> None:
         exc.raise_if_none(task=task)
 
         self._task = task
         self._max_memory = 0
         self._nanos = 0
-
-        self._task_completed_event = Event()
-        self._timeout_occurred = False
+        self._timed_out = False
 
     def run(self, timeout: float | None = None) -> Benchmark:
-        """Runs the benchmark."""
-        Thread(target=self._watchdog, args=[timeout], daemon=True).start()
+        """
+        Runs the benchmark.
+
+        :raises subprocess.TimeoutExpired: If the task does not complete before the timeout,
+            in which case it is killed along with its children.
+        """
+        self._timed_out = False
+        watchdog = None
+
+        if timeout is not None and not self._waits_on_pidfd():
+            # Without a pidfd, waiting with a timeout polls the process and skews
+            # the measured time, so the timeout is enforced by a watchdog instead.
+            watchdog = Timer(timeout, self._kill)
+            watchdog.daemon = True
+            timeout_arg = None
+        else:
+            timeout_arg = timeout
 
         start = perf_counter_ns()
-        self.task.run()
-        self._task_completed_event.set()
 
-        self._nanos = perf_counter_ns() - start
-        self._max_memory = self.task.rusage.ru_maxrss if self.task.rusage else 0
+        if watchdog:
+            watchdog.start()
+
+        try:
+            self.task.run(timeout=timeout_arg)
+        finally:
+            self._nanos = perf_counter_ns() - start
 
-        if platform.system() != 'Darwin':
-            self._max_memory *= 1024
+            if watchdog:
+                watchdog.cancel()
 
-        self.task.wait(timeout=timeout)
+            self._max_memory = self.task.rusage.ru_maxrss if self.task.rusage else 0
 
-        if self._timeout_occurred:
-            raise sp.TimeoutExpired(self._process.args, timeout,
+            if platform.system() != 'Darwin':
+                self._max_memory *= 1024
+
+        if self._timed_out:
+            raise sp.TimeoutExpired([self.task.path] + (self.task.args or []), timeout,
                                     output=self.task.stdout, stderr=self.task.stderr)
 
         return self
@@ -70,7 +120,15 @@ class Benchmark:
 
     # Private
 
-    def _watchdog(self, timeout: float) -> None:
-        if not self._task_completed_event.wait(timeout=timeout):
-            self._timeout_occurred = True
+    def _waits_on_pidfd(self) -> bool:
+        # Task.wait only blocks on a pidfd if the output is not piped.
+        return has_pidfd() and self.task.output_action != OutputAction.STORE
+
+    def _kill(self) -> None:
+        if self.task.completed:
+            return
+        try:
             self.task.send_signal(signal.SIGKILL, children=True)
+        except ProcessLookupError:
+            return
+        self._timed_out = True
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 import atexit
+import math
+import mmap
+import operator
 import os
 import random
 import re
@@ -8,18 +11,20 @@ import signal
 import subprocess as sp
 import tempfile
 from abc import ABC, abstractmethod
+from array import array
 from collections.abc import Sequence
 from functools import cached_property
-from threading import Event, Thread
-from time import perf_counter_ns, sleep
-from typing import Dict, Iterator, List, Set
+from itertools import repeat
+from threading import Condition, Event, Thread
+from time import perf_counter, perf_counter_ns
+from typing import Callable, Dict, FrozenSet, Iterator, List, Set
 
 from .bench import Benchmark
 from .task import OutputAction, Task
-from .util import find_executable, get_pid_tree
+from .util import PidTreeCache, find_executable
 from .. import exc, inspect
 from ..io import file
-from ..types.unit import PowerUnit
+from ..io.watch import Watch
 
 
 class EnergySample:
@@ -51,25 +56,29 @@ class EnergyProbe(ABC):
     :ivar interval: Sampling interval in milliseconds.
     :ivar start_timestamp: Start timestamp with nanoseconds resolution.
     :ivar stop_timestamp: Stop timestamp with nanoseconds resolution.
+    :ivar self_scheduling: If True, the probe acquires samples on its own schedule,
+        hence it is never polled and :meth:`stop` must return the sample average.
     """
 
     __ALL: List[EnergyProbe] = None
+    __BY_NAME: Dict[str, EnergyProbe] = None
 
     @classmethod
     def all(cls) -> List[EnergyProbe]:
         """Returns all the available energy probes."""
         if cls.__ALL is None:
             cls.__ALL = list(sorted((s() for s in inspect.subclasses(cls)), key=lambda p: p.name))
+            cls.__BY_NAME = {p.name.lower(): p for p in cls.__ALL}
         return cls.__ALL
 
     @classmethod
     def with_name(cls, name: str) -> EnergyProbe:
         """Returns the energy probe that has the specified name."""
+        cls.all()
         try:
-            name = name.lower()
-            return next(p for p in cls.all() if p.name.lower() == name)
-        except StopIteration:
-            raise ValueError(f'No energy probe named "{name}"')
+            return cls.__BY_NAME[name.lower()]
+        except KeyError:
+            raise ValueError(f'No energy probe named "{name.lower()}"')
 
     @cached_property
     def name(self) -> str:
@@ -91,6 +100,7 @@ class EnergyProbe(ABC):
         self.interval: int = 1000
         self.start_timestamp: int = 0
         self.stop_timestamp: int = 0
+        self.self_scheduling: bool = False
 
     @abstractmethod
     def start(self, task: Task) -> None:
@@ -128,29 +138,66 @@ class EnergyProbe(ABC):
 class EnergyProfiler:
     """Run an energy impact profiler for a given task."""
 
+    __slots__ = ('probes', '_power', '_interval', '_energy', '_task', '_task_completed_event')
+
+    @property
+    def name(self) -> str:
+        return self._task.name
+
+    @property
+    def pid(self) -> int | None:
+        return self._task.pid
+
+    @property
+    def stdout(self) -> str | None:
+        return self._task.stdout
+
+    @property
+    def stderr(self) -> str | None:
+        return self._task.stderr
+
+    @property
+    def completed(self) -> bool:
+        return self._task.completed
+
+    @property
+    def exit_code(self) -> int | None:
+        return self._task.exit_code
+
+    @property
+    def rusage(self):
+        return self._task.rusage
+
     def __init__(self, task: Task | Benchmark, probe: EnergyProbe | Sequence[EnergyProbe]) -> None:
         exc.raise_if_falsy(task=task, probe=probe)
         self.probes = (probe,) if isinstance(probe, EnergyProbe) else probe
-        self._samples: Dict[EnergyProbe, List[EnergySample]] = {}
+        self._power: Dict[EnergyProbe, array] = {}
+        self._interval: Dict[EnergyProbe, array] = {}
+        self._energy: Dict[EnergyProbe, float] = {}
         self._task = task
+        self._task_completed_event = Event()
 
     def samples(self, probe: EnergyProbe) -> List[EnergySample]:
         """Returns the samples gathered from the specified probe."""
-        return self._samples.get(probe, [])
+        intervals = self._interval.get(probe, ())
+        powers = self._power.get(probe, repeat(0.0))
+        return [EnergySample(p, i) for p, i in zip(powers, intervals)]
 
     def score(self, probe: EnergyProbe) -> float:
         """Returns an energy impact score according to the specified probe."""
-        return sum(s.energy for s in self._samples[probe]) / 1E3
+        return self._energy[probe] / 1E3
 
     def run(self, timeout: float | None = None) -> EnergyProfiler:
         """Runs the profiler."""
+        self._task_completed_event.clear()
         threads = self._start_probes()
 
         try:
             self._task.run(timeout=timeout)
         finally:
-            for i, probe in enumerate(self.probes):
-                threads[i].join(timeout=probe.interval_seconds * 2)
+            self._task_completed_event.set()
+            for interval, thread in threads.items():
+                thread.join(timeout=interval * 2 / 1E3)
             self._stop_probes()
 
         return self
@@ -160,15 +207,23 @@ class EnergyProfiler:
 
     # Private
 
-    def _start_probes(self) -> List[Thread]:
+    def _start_probes(self) -> Dict[int, Thread]:
+        groups: Dict[int, List[EnergyProbe]] = {}
+
         for probe in self.probes:
             probe.start(self._task)
             probe.start_timestamp = perf_counter_ns()
-            self._samples[probe] = list()
+            self._power.pop(probe, None)
+            self._interval[probe] = array('d')
+
+            if not probe.self_scheduling:
+                groups.setdefault(probe.interval, []).append(probe)
 
-        threads = [Thread(target=self._poll_probe, args=(p,), daemon=True) for p in self.probes]
+        # Probes sharing the same interval are polled by the same thread.
+        threads = {i: Thread(target=self._poll_probes, args=(g,), daemon=True)
+                   for i, g in groups.items()}
 
-        for thread in threads:
+        for thread in threads.values():
             thread.start()
 
         return threads
@@ -177,35 +232,64 @@ class EnergyProfiler:
         for probe in self.probes:
             probe.stop_timestamp = perf_counter_ns()
             power = probe.stop()
-            samples = self._samples[probe]
+            intervals = self._interval[probe]
+
+            if probe.self_scheduling:
+                intervals.append((probe.stop_timestamp - probe.start_timestamp) / 1E6)
 
             if isinstance(power, float):
-                for sample in samples:
-                    sample.power = power
+                power = array('d', (power,)) * len(intervals)
+            elif len(power) != len(intervals):
+                raise ValueError('Sample count does not match poll count')
             else:
-                if len(power) != len(samples):
-                    raise ValueError('Sample count does not match poll count')
+                power = array('d', power)
+
+            self._power[probe] = power
+            self._energy[probe] = math.fsum(map(operator.mul, power, intervals))
+
+    def _poll_probes(self, probes: List[EnergyProbe]) -> None:
+        interval_ns = probes[0].interval * 1000000
+        add_intervals = [self._interval[p].append for p in probes]
+        polls = [p.poll for p in probes]
+        wait_completed = self._task_completed_event.wait
+
+        prev_ns = [p.start_timestamp for p in probes]
+        deadline_ns = max(prev_ns) + interval_ns
+        completed = self._task_completed_event.is_set()
+        error: Exception | None = None
+
+        while not completed:
+            # Sleep until the absolute deadline, so that the time spent polling does not
+            # accumulate as drift. Task completion cuts the last interval short.
+            timeout = max(deadline_ns - perf_counter_ns(), 0) / 1E9
+            completed = wait_completed(timeout=timeout)
+
+            for i, poll in enumerate(polls):
+                if poll is None:
+                    continue
 
-                for i, sample in enumerate(power):
-                    samples[i].power = sample
+                cur_ns = perf_counter_ns()
 
-    def _poll_probe(self, probe: EnergyProbe) -> None:
-        interval_ns = probe.interval * 1000000
-        samples = self._samples[probe]
+                try:
+                    poll()
+                except Exception as e:
+                    # Stop polling the failing probe only, the others in the group are unaffected.
+                    polls[i] = None
+                    error = error or e
+                    continue
 
-        start_ns = probe.start_timestamp
-        cur_ns = perf_counter_ns()
+                add_intervals[i]((cur_ns - prev_ns[i]) / 1E6)
+                prev_ns[i] = cur_ns
 
-        while not self._task.completed:
-            sleep_ns = interval_ns - (cur_ns - start_ns)
+            deadline_ns += interval_ns
 
-            if sleep_ns > 0:
-                sleep(sleep_ns / 1E9)
+            # Skip deadlines missed because of a slow poll, rather than polling in a burst.
+            late_ns = perf_counter_ns() - deadline_ns
+            if late_ns > 0:
+                deadline_ns += (late_ns // interval_ns + 1) * interval_ns
 
-            cur_ns = perf_counter_ns()
-            probe.poll()
-            samples.append(EnergySample(interval=(cur_ns - start_ns) / 1E6))
-            start_ns = cur_ns
+        if error:
+            raise error
 
 
 class ZeroProbe(EnergyProbe):
@@ -213,10 +297,10 @@ class ZeroProbe(EnergyProbe):
 
     def __init__(self):
         super().__init__()
-        self._samples: List[float] | None = None
+        self._samples: array | None = None
 
     def start(self, task: Task) -> None:
-        self._samples = []
+        self._samples = array('d')
 
     def poll(self) -> None:
         self._samples.append(0.0)
@@ -230,12 +314,12 @@ class RandomProbe(EnergyProbe):
 
     def __init__(self):
         super().__init__()
-        self._samples: List[float] | None = None
+        self._samples: array | None = None
         self.min = 0.0
         self.max = 1.0
 
     def start(self, task: Task) -> None:
-        self._samples = []
+        self._samples = array('d')
 
     def poll(self) -> None:
         self._samples.append(random.uniform(self.min, self.max))
@@ -245,108 +329,161 @@ class RandomProbe(EnergyProbe):
 
 
 class PowermetricsProbe(EnergyProbe):
-    """EnergyProbe implementation using powermetrics on macOS."""
+    """
+    EnergyProbe implementation using powermetrics on macOS.
+    Powermetrics samples on its own schedule, hence the probe reports the mean sample.
+    """
+
+    _BLOCK_START = b'*** Running tasks ***'
+    _BLOCK_END_RE = re.compile(rb'^[ \t]*ALL_TASKS', re.MULTILINE)
+    _TASK_RE = re.compile(rb'^[ \t]*\S+[ \t]+(-?\d+)[ \t](?:[^\n]*[ \t])?(\d+(?:\.\d+)?)\s*?$',
+                          re.MULTILINE)
+    _DEAD_TASKS_PID = -1
+    _READ_SIZE = 64 * 1024
 
     def __init__(self) -> None:
         super().__init__()
+        self.self_scheduling = True
         self._task: Task | None = None
-        self._samples: List[float] | None = None
+        self._samples: array | None = None
+        self._samples_sum = 0.0
         self._energy_task: sp.Popen | None = None
-        self._energy_task_event: Event = Event()
+        self._parser_thread: Thread | None = None
+        self._block_parsed = Condition()
+        self._bytes_read = 0
+        self._last_block_start = -1
+        self._pids: FrozenSet[int] = frozenset()
+        self._pid_trees = PidTreeCache(max_age=0.0)
 
     def start(self, task: Task) -> None:
         exc.raise_if_not_root()
         self._task = task
-        self._samples = []
+        self._samples = array('d')
+        self._samples_sum = 0.0
+        self._bytes_read = 0
+        self._last_block_start = -1
+        # Rescan for every block, so that newly spawned children are accounted for.
+        self._pid_trees.max_age = self.interval_seconds / 2
+        self._pid_trees.clear()
+        self._pids = frozenset()
 
         args = [
             find_executable('powermetrics'),
             '--samplers', 'tasks',
             '--show-process-energy',
-            '-i', '0',
+            '-i', str(self.interval),
         ]
 
-        self._energy_task = sp.Popen(args, stdout=sp.PIPE, stderr=sp.DEVNULL, text=True)
+        self._energy_task = sp.Popen(args, stdout=sp.PIPE, stderr=sp.DEVNULL)
 
-        thread = Thread(target=self._parse_profiler)
-        thread.daemon = True
-        thread.start()
+        self._parser_thread = Thread(target=self._parse_profiler)
+        self._parser_thread.daemon = True
+        self._parser_thread.start()
 
     def poll(self) -> None:
-        self._energy_task.send_signal(signal.SIGINFO)
+        pass
+
+    def stop(self) -> float:
+        # Request a last sample, so that the tail of the task is accounted for.
+        # Blocks that were already being output when the signal was sent do not count.
+        with self._block_parsed:
+            signal_pos = self._bytes_read
+            self._energy_task.send_signal(signal.SIGINFO)
+            self._block_parsed.wait_for(lambda: self._last_block_start >= signal_pos,
+                                        timeout=self.interval_seconds)
 
-    def stop(self) -> Sequence[float]:
         self._energy_task.terminate()
+        self._parser_thread.join(timeout=self.interval_seconds * 2)
 
-        if not self._energy_task_event.wait(timeout=self.interval_seconds * 2):
+        if self._parser_thread.is_alive():
             self._energy_task.kill()
-            self._energy_task.wait()
-
-        # Normalize last sample if possible.
-        if self._samples and isinstance(self._task, Benchmark):
-            interval_count = int(self._task.milliseconds) // self.interval
-            if interval_count == len(self._samples) - 1:
-                last_interval = int(self._task.milliseconds) % self.interval
-                self._samples[-1] *= last_interval / self.interval
+            self._parser_thread.join()
 
-        return self._samples
+        return self._mean()
 
     # Private
 
     def _mean(self) -> float:
         n_samples = len(self._samples)
-        return sum(self._samples) / n_samples if n_samples else 0.0
+        return self._samples_sum / n_samples if n_samples else 0.0
+
+    def _add_sample(self, sample: float) -> None:
+        self._samples.append(sample)
+        self._samples_sum += sample
 
     def _parse_profiler(self) -> None:
-        self._energy_task_event.clear()
+        # Bind hot attributes to locals, as this loop runs for the whole profiling session.
+        read = self._energy_task.stdout.read1
+        read_size = self._READ_SIZE
+        block_start = self._BLOCK_START
+        block_start_len = len(block_start)
+        find_block_end = self._BLOCK_END_RE.search
+        parse_tasks = self._parse_tasks
+        block_parsed = self._block_parsed
+        buf = bytearray()
+        buf_pos = 0  # Stream offset of the first byte in the buffer.
+
+        while True:
+            chunk = read(read_size)
+
+            if not chunk:
+                break
+
+            with block_parsed:
+                self._bytes_read += len(chunk)
+
+            buf += chunk
+
+            while True:
+                start = buf.find(block_start)
+
+                if start < 0:
+                    # Only retain what could be the beginning of a block.
+                    discarded = max(len(buf) - block_start_len, 0)
+                    del buf[:discarded]
+                    buf_pos += discarded
+                    break
 
-        task_lines = []
-        should_parse = False
+                end = find_block_end(buf, start)
 
-        for line in self._energy_task.stdout:
-            line = line.strip()
+                if not end:
+                    del buf[:start]
+                    buf_pos += start
+                    break
 
-            if '*** Running tasks ***' in line:
-                should_parse = True
-            elif line.startswith('ALL_TASKS'):
-                if should_parse:
-                    self._parse_tasks(task_lines)
-                    task_lines.clear()
-                    should_parse = False
-            elif should_parse:
-                task_lines.append(line)
+                parse_tasks(bytes(buf[start:end.start()]))
 
-        self._energy_task.communicate()
-        self._energy_task_event.set()
+                with block_parsed:
+                    self._last_block_start = buf_pos + start
+                    block_parsed.notify_all()
 
-    def _parse_tasks(self, task_lines: List[str]) -> None:
-        pids = get_pid_tree(self._task.pid)
-        dead_tasks_pid = -1
+                del buf[:end.end()]
+                buf_pos += end.end()
 
-        score = None
-        dead_tasks_score = None
+        self._energy_task.stdout.close()
+        self._energy_task.wait()
 
-        for line in task_lines:
-            components = line.strip().split()
+    def _parse_tasks(self, block: bytes) -> None:
+        # Once the task has been reaped its PID may be reused, so stick to the last scanned tree.
+        if not self._task.completed:
+            self._pids = self._pid_trees.get(self._task.pid)
 
-            try:
-                pid = int(components[1])
-                pid_score = float(components[-1])
+        pids = self._pids
+        matches = self._TASK_RE.finditer(block)
+        pid_scores = [(int(m.group(1)), float(m.group(2))) for m in matches]
 
-                if pid == dead_tasks_pid:
-                    # Estimate based on DEAD_TASKS.
-                    dead_tasks_score = self._validated_dead_tasks_score(pid_score)
-                else:
-                    # Sum sample if pid belongs to the profiled process.
-                    pids.remove(pid)
-                    score = pid_score if score is None else score + pid_score
-            except (IndexError, ValueError):
-                continue
+        # Sum samples of the pids that belong to the profiled process.
+        scores = [s for pid, s in pid_scores if pid in pids]
 
-        score = dead_tasks_score if score is None else score
+        if scores:
+            self._add_sample(sum(scores))
+            return
+
+        # Estimate based on DEAD_TASKS.
+        scores = [s for pid, s in pid_scores if pid == self._DEAD_TASKS_PID]
 
-        if score is not None:
-            self._samples.append(score)
+        if scores:
+            self._add_sample(self._validated_dead_tasks_score(scores[-1]))
 
     def _validated_dead_tasks_score(self, score: float) -> float | None:
         n_samples = len(self._samples)
@@ -363,7 +500,10 @@ class PowermetricsProbe(EnergyProbe):
 class PowertopProbe(EnergyProbe):
     """EnergyProbe implementation using powertop on GNU/Linux."""
 
-    _PID_RE = re.compile(r';\[PID (\d+)].*;\s*([\d.]+)\s([mu]?W)\s*$')
+    _PID_RE = re.compile(rb';\[PID (\d+)][^\n]*;[ \t]*(\d+\.?\d*|\.\d+)[ \t]([mu]?W)\s*?$',
+                         re.MULTILINE)
+    _UNIT_SCALE = {b'W': 1.0, b'mW': 1.0E-3, b'uW': 1.0E-6}
+    _HEADER = b'Overview of Software Power Consumers'
     _REPORT_FILENAME = 'report'
     _MAX_READ_ATTEMPTS = 10
 
@@ -372,22 +512,28 @@ class PowertopProbe(EnergyProbe):
         self._task: Task | None = None
         self._energy_task: Task | None = None
         self._pids: Set[int] | None = None
+        self._pid_trees = PidTreeCache(max_age=0.0)
         self._report_dir: str = tempfile.mkdtemp(prefix='pyutils_powertop_')
+        self._report_watch: Watch | None = None
 
     def start(self, task: Task) -> None:
         exc.raise_if_not_root()
 
         self._task = task
         self._pids = set()
+        self._pid_trees.max_age = self.interval_seconds / 2
+        self._pid_trees.clear()
 
         self._start_energy_task()
         self._wait_for_new_reports()
 
     def stop(self) -> float:
-        # Freeze reports before further processing
-        samples = list(self._reports())
-        samples.sort(key=lambda x: os.path.getmtime(x))
-        samples = [self._read_report(r) for r in samples]
+        # Freeze reports before further processing. Powertop writes them one at a time,
+        # so only the newest one may still be incomplete.
+        reports = self._reports_by_mtime()
+        if reports:
+            self._wait_for_report(reports[-1])
+        samples = [self._read_report(r) for r in reports]
 
         # The last report may not contain the profiled process,
         # in which case we discard it
@@ -397,7 +543,9 @@ class PowertopProbe(EnergyProbe):
         return sum(samples) / len(samples) if samples else 0.0
 
     def poll(self) -> None:
-        self._pids.update(get_pid_tree(self._task.pid, include_tids=True))
+        # Once the task has been reaped its PID may be reused.
+        if not self._task.completed:
+            self._pids.update(self._pid_trees.get(self._task.pid, include_tids=True))
 
     # Private
 
@@ -407,6 +555,7 @@ class PowertopProbe(EnergyProbe):
 
         atexit.register(self._force_close)
         file.create_dir(self._report_dir)
+        self._report_watch = Watch(self._report_dir)
 
         args = [
             '-t', str(self.interval_seconds),
@@ -418,48 +567,63 @@ class PowertopProbe(EnergyProbe):
 
     def _wait_for_new_reports(self) -> None:
         file.remove_dir_contents(self._report_dir)
-        while not next(self._reports(), None):
-            sleep(0.1)
+        self._wait_for(lambda: next(self._reports(), None) is not None)
 
     def _wait_for_report(self, path: str) -> None:
-        wait_intervals = 10
-        check_frequency = 10
+        self._wait_for(lambda: os.path.getsize(path) > 0, timeout=self.interval_seconds * 10)
 
-        for _ in range(wait_intervals * check_frequency):
-            if os.path.getsize(path) > 0:
-                break
-            sleep(self.interval_seconds / check_frequency)
+    def _wait_for(self, condition: Callable[[], bool], timeout: float | None = None) -> bool:
+        """
+        Waits until the condition holds, re-checking it whenever
+        a report is created or written to.
+        """
+        deadline = None if timeout is None else perf_counter() + timeout
 
-    def _read_report(self, path: str) -> float:
-        self._wait_for_report(path)
+        while not condition():
+            wait_time = self.interval_seconds
 
-        sample = 0.0
-        header_found = False
-        header = 'Overview of Software Power Consumers'
+            if deadline is not None:
+                remaining = deadline - perf_counter()
+                if remaining <= 0:
+                    return False
+                wait_time = min(wait_time, remaining)
 
-        with open(path, 'r') as report_file:
-            for line in report_file:
-                if not header_found and header not in line:
-                    continue
+            self._report_watch.wait(timeout=wait_time)
 
-                header_found = True
-                res = self._PID_RE.search(line)
+        return True
 
-                if res and int(res.group(1)) in self._pids:
-                    sample += self._parse_value(res.group(2), res.group(3))
+    def _read_report(self, path: str) -> float:
+        with open(path, 'rb') as report_file:
+            # Mapping small (or empty) reports is not worth it.
+            if os.fstat(report_file.fileno()).st_size < mmap.ALLOCATIONGRANULARITY:
+                return self._parse_report(report_file.read())
 
-        return sample
+            with mmap.mmap(report_file.fileno(), 0, access=mmap.ACCESS_READ) as report:
+                return self._parse_report(report)
 
-    def _parse_value(self, value: str, unit: str) -> float:
-        try:
-            return PowerUnit(unit)(value).to_value(PowerUnit.W)
-        except (KeyError, ValueError):
+    def _parse_report(self, report: bytes | mmap.mmap) -> float:
+        start = report.find(self._HEADER)
+
+        if start < 0:
             return 0.0
 
+        pids = self._pids
+        scale = self._UNIT_SCALE
+        return sum(float(m.group(2)) * scale[m.group(3)]
+                   for m in self._PID_RE.finditer(report, start)
+                   if int(m.group(1)) in pids)
+
     def _reports(self) -> Iterator:
         return file.dir_contents(self._report_dir, include_dirs=False)
 
+    def _reports_by_mtime(self) -> List[str]:
+        with os.scandir(self._report_dir) as it:
+            reports = sorted((e.stat().st_mtime_ns, e.path) for e in it if e.is_file())
+        return [path for _, path in reports]
+
     def _force_close(self) -> None:
         if self._energy_task:
             self._energy_task.send_signal(signal.SIGKILL)
+        if self._report_watch:
+            self._report_watch.close()
         file.remove_dir(self._report_dir, recursive=True)
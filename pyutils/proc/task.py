@@ -1,14 +1,15 @@
 from __future__ import annotations
 
 import os
+import select
 import signal
 import subprocess as sp
 import types
 from enum import Enum, auto
-from threading import Thread
-from typing import Callable, List, Set
+from threading import Lock, Thread
+from typing import Callable, List, Set, Tuple
 
-from .util import find_executable, kill
+from .util import find_executable, has_pidfd, kill
 from .. import exc
 
 
@@ -27,6 +28,8 @@ class Task:
     """Spawn processes and easily capture their output."""
 
     _ALL: Set[Task] = set()
+    _ALL_LOCK = Lock()
+    _CLEANUP_THRESHOLD = 64
 
     @property
     def name(self) -> str:
@@ -54,8 +57,9 @@ class Task:
 
     @classmethod
     def get_running(cls) -> List[Task]:
-        cls._cleanup_tasks()
-        return list(cls._ALL)
+        with cls._ALL_LOCK:
+            cls._cleanup_tasks()
+            return list(cls._ALL)
 
     @classmethod
     def terminate_all(cls, kill: bool = False) -> None:
@@ -67,12 +71,19 @@ class Task:
 
     @classmethod
     def _add_task(cls, task: Task) -> None:
-        cls._cleanup_tasks()
-        cls._ALL.add(task)
+        # Tasks may be run from multiple threads (e.g. via run_async).
+        with cls._ALL_LOCK:
+            # Completed tasks are pruned lazily rather than on every addition.
+            if len(cls._ALL) >= cls._CLEANUP_THRESHOLD:
+                cls._cleanup_tasks()
+            cls._ALL.add(task)
 
     @classmethod
     def _cleanup_tasks(cls) -> None:
-        cls._ALL.difference_update({t for t in cls._ALL if t.completed})
+        """Removes completed tasks. Must be called while holding _ALL_LOCK."""
+        done = [t for t in cls._ALL if t.completed]
+        if done:
+            cls._ALL.difference_update(done)
 
     @classmethod
     def spawn(
@@ -132,7 +143,6 @@ class Task:
 
         self._completed: sp.CompletedProcess | None = None
         self._process: sp.Popen | None = None
-        self._add_task(self)
 
     def run(self, wait: bool = True, timeout: float | None = None) -> Task:
         """Run the task."""
@@ -152,6 +162,7 @@ class Task:
             self._process = sp.Popen(
                 self._popen_args, stdout=handle, stderr=handle, stdin=stdin, text=True
             )
+            self._add_task(self)
 
             if wait:
                 self.wait(timeout=timeout)
@@ -171,17 +182,19 @@ class Task:
         out, err = None, None
         try:
             self.__patch_wait(self._process)
+            if timeout is not None and not (self._process.stdout or self._process.stderr):
+                self._wait_exit(timeout)
             out, err = self._process.communicate(timeout=timeout)
         except sp.TimeoutExpired as e:
             self.send_signal(sig=signal.SIGKILL, children=True)
-            out, err = self._process.communicate(timeout=5.0)
+            out, err = self._drain(timeout=5.0)
             raise sp.TimeoutExpired(self._process.args, timeout, output=out, stderr=err) from e
         except Exception:
             self.send_signal(sig=signal.SIGKILL, children=True)
             raise
         finally:
             self.rusage = getattr(self._process, "rusage", None)
-            self._completed = sp.CompletedProcess(self._popen_args, self._process.poll(), out, err)
+            self._completed = sp.CompletedProcess(self._process.args, self._process.poll(), out, err)
         return self
 
     def run_async(
@@ -239,6 +252,40 @@ class Task:
 
         return args
 
+    def _wait_exit(self, timeout: float) -> None:
+        """
+        Blocks until the process exits. Where pidfds are supported, this avoids
+        the sleep-and-poll loop Popen.wait runs when given a timeout.
+
+        :raises subprocess.TimeoutExpired: If the process does not exit before the timeout.
+        """
+        if not has_pidfd():
+            return
+
+        try:
+            fd = os.pidfd_open(self._process.pid)
+        except OSError:
+            return
+
+        try:
+            if not select.select([fd], [], [], timeout)[0]:
+                raise sp.TimeoutExpired(self._process.args, timeout)
+        finally:
+            os.close(fd)
+
+    def _drain(self, timeout: float) -> Tuple[str | None, str | None]:
+        """
+        Collects the output of a killed process. If some process outside of the task's tree
+        keeps the pipes open past the timeout, the pipes are closed and the output is dropped.
+        """
+        try:
+            return self._process.communicate(timeout=timeout)
+        except sp.TimeoutExpired:
+            for pipe in (self._process.stdout, self._process.stderr):
+                if pipe:
+                    pipe.close()
+            return None, None
+
     def _run_async_thread(
         self,
         timeout: float | None,
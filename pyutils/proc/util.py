@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import os
 import re
+import shutil
 import signal
-from distutils import spawn
 from functools import cache
-from typing import List
+from time import perf_counter
+from typing import Dict, FrozenSet, Iterator, List, Tuple
 
 from .. import exc
 
@@ -12,7 +14,7 @@ from .. import exc
 @cache
 def find_executable(executable: str, path: str | None = None) -> str:
     """Try to find 'executable' in the directories listed in 'path'."""
-    exe_path = spawn.find_executable(executable, path)
+    exe_path = shutil.which(executable, path=path)
 
     if not exe_path:
         exc.raise_not_found(message=f'Could not find the {executable} executable')
@@ -20,9 +22,25 @@ def find_executable(executable: str, path: str | None = None) -> str:
     return exe_path
 
 
+@cache
+def has_pidfd() -> bool:
+    """Checks whether processes can be waited for via pidfds (Linux 5.3+)."""
+    try:
+        os.close(os.pidfd_open(os.getpid()))
+    except (AttributeError, OSError):
+        return False
+    return True
+
+
 def get_children_pids(pid: int, recursive: bool = False,
                       include_tids: bool = False) -> List[int] | None:
     """Retrieves children PIDs and optionally TIDs of the process with the specified PID."""
+    if not include_tids and _has_proc_children():
+        try:
+            return _proc_descendants(pid) if recursive else _proc_children(pid)
+        except (FileNotFoundError, ProcessLookupError):
+            return None
+
     ps = _import_psutil()
 
     try:
@@ -50,24 +68,43 @@ def get_pid_tree(pid: int, include_tids: bool = False) -> List[int]:
     return [] if pids is None else [pid] + pids
 
 
+class PidTreeCache:
+    """
+    Caches PID trees retrieved via :func:`get_pid_tree`,
+    so that they are scanned at most once every 'max_age' seconds.
+    """
+
+    def __init__(self, max_age: float) -> None:
+        self.max_age = max_age
+        self._trees: Dict[Tuple[int, bool], Tuple[float, FrozenSet[int]]] = {}
+
+    def get(self, pid: int, include_tids: bool = False) -> FrozenSet[int]:
+        """Returns the PID tree of the specified process, scanning it again if stale."""
+        key = (pid, include_tids)
+        now = perf_counter()
+        entry = self._trees.get(key)
+
+        if entry is None or now - entry[0] >= self.max_age:
+            entry = self._trees[key] = (now, frozenset(get_pid_tree(pid, include_tids)))
+
+        return entry[1]
+
+    def clear(self) -> None:
+        """Discards all the cached PID trees."""
+        self._trees.clear()
+
+
 def find_pids(pattern: str, regex: bool = False,
               match_arguments: bool = False, only_first: bool = False) -> List[int]:
     """Find PIDs by name or regex."""
-    ps = _import_psutil()
-
     c_regex = re.compile(pattern) if regex else None
     pids = []
 
-    for proc in ps.process_iter():
-        try:
-            haystack = ' '.join(proc.cmdline()) if match_arguments else proc.name()
-        except ps.AccessDenied:
-            continue
-
+    for pid, haystack in _processes(match_arguments):
         found = c_regex.search(haystack) if regex else pattern == haystack
 
         if found:
-            pids.append(proc.pid)
+            pids.append(pid)
 
             if only_first:
                 break
@@ -76,16 +113,28 @@ def find_pids(pattern: str, regex: bool = False,
 
 
 def kill(pid: int, sig: int = signal.SIGKILL, children: bool = False) -> None:
-    """Sends a signal to the specified process and (optionally) to its children."""
-    ps = _import_psutil()
+    """
+    Sends a signal to the specified process and (optionally) to its children.
 
-    proc = ps.Process(pid)
+    :raises ProcessLookupError: If the process does not exist.
+    """
+    if not _has_proc_children():
+        _ps_kill(pid, sig, children)
+        return
 
     if children:
-        for child in proc.children(recursive=True):
-            child.send_signal(sig)
+        try:
+            descendants = _proc_descendants(pid)
+        except (FileNotFoundError, ProcessLookupError):
+            descendants = []
+
+        for child in descendants:
+            try:
+                os.kill(child, sig)
+            except ProcessLookupError:
+                pass
 
-    proc.send_signal(sig)
+    os.kill(pid, sig)
 
 
 def killall(process: str, sig: int = signal.SIGKILL) -> bool:
@@ -118,6 +167,115 @@ def pkill(pattern: str, sig: int = signal.SIGKILL, match_arguments: bool = True)
     return found
 
 
+def _processes(cmdline: bool = False) -> Iterator[Tuple[int, str]]:
+    """Yields the PID of each process along with either its name or its command line."""
+    if not os.path.isdir('/proc'):
+        yield from _ps_processes(cmdline)
+        return
+
+    with os.scandir('/proc') as it:
+        pids = [int(e.name) for e in it if e.name.isdigit()]
+
+    for pid in pids:
+        try:
+            yield pid, _proc_cmdline(pid) if cmdline else _proc_name(pid)
+        except (FileNotFoundError, ProcessLookupError, PermissionError):
+            continue
+
+
+@cache
+def _has_proc_children() -> bool:
+    """Checks whether procfs exposes the children of each thread."""
+    return os.path.exists(f'/proc/self/task/{os.getpid()}/children')
+
+
+def _proc_children(pid: int) -> List[int]:
+    """Reads the PIDs of the children of a process from procfs."""
+    children = []
+
+    with os.scandir(f'/proc/{pid}/task') as it:
+        tasks = [e.path for e in it]
+
+    for task in tasks:
+        try:
+            with open(f'{task}/children', 'rb') as f:
+                children.extend(int(c) for c in f.read().split())
+        except (FileNotFoundError, ProcessLookupError):
+            continue
+
+    return children
+
+
+def _proc_descendants(pid: int) -> List[int]:
+    """Returns the PIDs of the descendants of a process in breadth-first order."""
+    pids = _proc_children(pid)
+    i = 0
+
+    while i < len(pids):
+        try:
+            pids.extend(_proc_children(pids[i]))
+        except (FileNotFoundError, ProcessLookupError):
+            pass
+        i += 1
+
+    return pids
+
+
+def _ps_kill(pid: int, sig: int, children: bool) -> None:
+    """Same as :func:`kill`, relying on psutil."""
+    ps = _import_psutil()
+
+    try:
+        proc = ps.Process(pid)
+        descendants = proc.children(recursive=True) if children else []
+    except ps.NoSuchProcess as e:
+        raise ProcessLookupError(f'No such process: {pid}') from e
+
+    for child in descendants:
+        try:
+            child.send_signal(sig)
+        except ps.NoSuchProcess:
+            pass
+
+    try:
+        proc.send_signal(sig)
+    except ps.NoSuchProcess as e:
+        raise ProcessLookupError(f'No such process: {pid}') from e
+
+
+def _ps_processes(cmdline: bool = False) -> Iterator[Tuple[int, str]]:
+    """Same as :func:`_processes`, relying on psutil."""
+    ps = _import_psutil()
+
+    for proc in ps.process_iter():
+        try:
+            yield proc.pid, ' '.join(proc.cmdline()) if cmdline else proc.name()
+        except (ps.AccessDenied, ps.NoSuchProcess):
+            continue
+
+
+def _proc_cmdline(pid: int) -> str:
+    """Reads the command line of a process from procfs, joining arguments with spaces."""
+    with open(f'/proc/{pid}/cmdline', 'rb') as f:
+        return os.fsdecode(f.read().rstrip(b'\0').replace(b'\0', b' '))
+
+
+def _proc_name(pid: int) -> str:
+    """Reads the name of a process from procfs, matching psutil's Process.name."""
+    with open(f'/proc/{pid}/comm', 'rb') as f:
+        name = os.fsdecode(f.read().rstrip(b'\n'))
+
+    # The kernel truncates names to 15 characters, in which case psutil
+    # recovers the full name from the command line.
+    if len(name) >= 15:
+        with open(f'/proc/{pid}/cmdline', 'rb') as f:
+            exe = os.path.basename(os.fsdecode(f.read().split(b'\0', 1)[0]))
+        if exe.startswith(name):
+            name = exe
+
+    return name
+
+
 # noinspection PyPackageRequirements,PyUnresolvedReferences
 def _import_psutil():
     """Convenience function for optional psutil import."""
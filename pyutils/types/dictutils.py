@@ -2,7 +2,6 @@ from __future__ import annotations
 
 from typing import Dict, Mapping
 
-from .string import split
 from .. import exc
 
 
@@ -15,10 +14,16 @@ def from_string(string: str, line_sep: str = '\n', value_sep: str = '=',
     if not string:
         return dictionary
 
-    for line in split(string, sep=line_sep):
-        k, v = line.partition(value_sep)[::2]
-        k = k.strip()
-        v = v.strip()
+    sep_len = len(value_sep)
+
+    for line in string.split(line_sep):
+        idx = line.find(value_sep)
+
+        if idx < 0:
+            continue
+
+        k = line[:idx].strip()
+        v = line[idx + sep_len:].strip()
 
         if strip_chars:
             k = k.strip(strip_chars)
@@ -50,24 +55,36 @@ def masked_with_defaults(dictionary: Mapping, defaults: Mapping, mask_falsy: boo
 def updated_recursive(dictionary: Mapping, update_dict: Mapping) -> Dict:
     """Recursively updates nested dictionaries."""
     local_dict = dict(dictionary)
+    stack = [(local_dict, update_dict)]
 
-    for k, v in update_dict.items():
-        if isinstance(v, dict):
-            result = updated_recursive(local_dict.get(k, {}), v)
-            local_dict[k] = result
-        else:
-            local_dict[k] = update_dict[k]
+    while stack:
+        dst, src = stack.pop()
+
+        for k, v in src.items():
+            if isinstance(v, dict):
+                child = dst[k] = dict(dst.get(k, {}))
+                stack.append((child, v))
+            else:
+                dst[k] = v
 
     return local_dict
 
 
 def is_updated(dictionary: Mapping, update_dict: Mapping) -> bool:
     """Checks if the dictionary has been updated with the values from update_dict."""
-    for k, v in update_dict.items():
-        if isinstance(v, dict):
-            if not is_updated(dictionary.get(k, {}), v):
+    # One iterator per level keeps the comparison order of a recursive visit.
+    stack = [(dictionary, iter(update_dict.items()))]
+
+    while stack:
+        dst, items = stack[-1]
+
+        for k, v in items:
+            if isinstance(v, dict):
+                stack.append((dst.get(k, {}), iter(v.items())))
+                break
+            elif dst[k] != v:
                 return False
-        elif dictionary[k] != update_dict[k]:
-            return False
+        else:
+            stack.pop()
 
     return True
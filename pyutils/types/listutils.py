@@ -15,8 +15,29 @@ class Overflow(Enum):
 
 def get(l: List[T], i: int, default=None, overflow=Overflow.DEFAULT) -> T | None:
     """Returns the element at the specified index, accounting for overflow."""
-    if overflow == Overflow.DEFAULT:
-        return l[i] if i < len(l) else default
-    if overflow == Overflow.MOD:
-        return l[i % len(l)] if l else default
+    return _GETTERS[overflow](l, i, default)
+
+
+# Private functions
+
+
+def _get_default(l: List[T], i: int, default) -> T | None:
+    try:
+        return l[i]
+    except IndexError:
+        return default
+
+
+def _get_mod(l: List[T], i: int, default) -> T | None:
+    return l[i % len(l)] if l else default
+
+
+def _get_raise(l: List[T], i: int, _) -> T:
     return l[i]
+
+
+_GETTERS = {
+    Overflow.DEFAULT: _get_default,
+    Overflow.MOD: _get_mod,
+    Overflow.RAISE: _get_raise,
+}
@@ -1,14 +1,16 @@
 import hashlib
 import re
+from functools import lru_cache
 from typing import Iterator
 
 
-__CAMEL_CASE_REGEX = re.compile('.+?(?:(?<=[a-z])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])|$)')
+__HASH_CACHE_MAX_LEN = 1024
+__CAMEL_CASE_BOUNDARY_REGEX = re.compile('(?<=[a-z])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])')
 
 
 def camel_case_split(string: str) -> Iterator[str]:
     """Splits a CamelCase string."""
-    return (m.group(0) for m in __CAMEL_CASE_REGEX.finditer(string))
+    return iter(__CAMEL_CASE_BOUNDARY_REGEX.split(string) if string else ())
 
 
 def snake_case_split(string: str) -> Iterator[str]:
@@ -18,7 +20,9 @@ def snake_case_split(string: str) -> Iterator[str]:
 
 def hex_hash(string: str, algo: str = 'sha1') -> str:
     """Returns the hash of the specified string."""
-    return getattr(hashlib, algo)(string.encode('utf-8')).hexdigest()
+    if len(string) > __HASH_CACHE_MAX_LEN:
+        return _hex_hash(string, algo)
+    return _cached_hex_hash(string, algo)
 
 
 def split(string: str, sep: str = ' ', strip: bool = True) -> Iterator[str]:
@@ -31,3 +35,15 @@ def split(string: str, sep: str = ' ', strip: bool = True) -> Iterator[str]:
             return
         yield string[cur:idx].strip() if strip else string[cur:idx]
         cur = idx + sep_len
+
+
+# Private functions
+
+
+def _hex_hash(string: str, algo: str) -> str:
+    return getattr(hashlib, algo)(string.encode('utf-8')).hexdigest()
+
+
+@lru_cache(maxsize=1024)
+def _cached_hex_hash(string: str, algo: str) -> str:
+    return _hex_hash(string, algo)
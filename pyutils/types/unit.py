@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from functools import cached_property
 from typing import Generic, TypeVar, Union
 
 from .strenum import StrEnum
@@ -12,6 +13,8 @@ Value = Union[int, float, str]
 class Measurement(Generic[Unit]):
     """Measurement."""
 
+    __slots__ = ('value', 'unit')
+
     def __init__(self, value: Value, unit: Unit) -> None:
         self.value = float(value)
         self.unit = unit
@@ -26,12 +29,12 @@ class Measurement(Generic[Unit]):
         """Returns a measurement with a human readable unit."""
         all_units = self.unit.__class__.all()
         value = self.value * self.unit.multiplier
+        to_unit = all_units[-1]
 
-        try:
-            to_unit = next(all_units[i] for i in range(len(all_units))
-                           if value < all_units[i + 1].multiplier)
-        except IndexError:
-            to_unit = all_units[-1]
+        for unit, next_unit in zip(all_units, all_units[1:]):
+            if value < next_unit.multiplier:
+                to_unit = unit
+                break
 
         return self.to(to_unit)
 
@@ -61,7 +64,7 @@ class ScalarUnit(StrEnum):
     MILLIONS = 'millions'
     BILLIONS = 'billions'
 
-    @property
+    @cached_property
     def multiplier(self) -> float:
         mult = (1.0, 1.0E3, 1.0E6, 1.0E9, 1.0E12, 1.0E15, 1.0E18)
         return mult[self.all().index(self)]
@@ -72,7 +75,7 @@ class ScalarUnit(StrEnum):
 
 class ScalarMeasurement(Measurement[ScalarUnit]):
     """Scalar measurement."""
-    pass
+    __slots__ = ()
 
 
 class TimeUnit(StrEnum):
@@ -86,7 +89,7 @@ class TimeUnit(StrEnum):
     H = 'h'
     D = 'd'
 
-    @property
+    @cached_property
     def multiplier(self) -> float:
         mult = (1.0, 1.0E3, 1.0E6, 1.0E9, 6.0E10, 3.6E12, 8.64E13)
         return mult[self.all().index(self)]
@@ -97,7 +100,7 @@ class TimeUnit(StrEnum):
 
 class TimeMeasurement(Measurement[TimeUnit]):
     """Time measurement."""
-    pass
+    __slots__ = ()
 
 
 class MemoryUnit(StrEnum):
@@ -113,7 +116,7 @@ class MemoryUnit(StrEnum):
     ZB = 'ZB'
     YB = 'YB'
 
-    @property
+    @cached_property
     def multiplier(self) -> float:
         mult = (1.0, 2.0 ** 10, 2.0 ** 20, 2.0 ** 30, 2.0 ** 40,
                 2.0 ** 50, 2.0 ** 60, 2.0 ** 70, 2.0 ** 80)
@@ -125,7 +128,7 @@ class MemoryUnit(StrEnum):
 
 class MemoryMeasurement(Measurement[MemoryUnit]):
     """Memory measurement."""
-    pass
+    __slots__ = ()
 
 
 class PowerUnit(StrEnum):
@@ -136,7 +139,7 @@ class PowerUnit(StrEnum):
     W = 'W'
     KW = 'KW'
 
-    @property
+    @cached_property
     def multiplier(self) -> float:
         mult = (1.0E-6, 1.0E-3, 1.0, 1.0E3)
         return mult[self.all().index(self)]
@@ -147,4 +150,4 @@ class PowerUnit(StrEnum):
 
 class PowerMeasurement(Measurement[PowerUnit]):
     """Memory measurement."""
-    pass
+    __slots__ = ()